@@ -2,22 +2,21 @@ from __future__ import annotations
 
 import argparse
 import logging
-from decimal import Decimal
 
-from saga_demo.models import OrderRequest
+from saga_demo.models import OrderRequest, format_cents, to_cents
 from saga_demo.saga import SagaOrchestrator
 from saga_demo.store import Store
 
 
 def seed(store: Store) -> None:
-    store.add_user(1, Decimal("1000.00"))
-    store.add_user(2, Decimal("50.00"))
+    store.add_user(1, to_cents("1000.00"))
+    store.add_user(2, to_cents("50.00"))
 
-    store.add_item("ITEM001", price=Decimal("100.00"), on_hand=10)
-    store.add_item("ITEM002", price=Decimal("100.00"), on_hand=5)
+    store.add_item("ITEM001", price=to_cents("100.00"), on_hand=10)
+    store.add_item("ITEM002", price=to_cents("100.00"), on_hand=5)
 
-    store.add_promo("DISCOUNT10", remaining_uses=5, discount_amount=Decimal("10.00"))
-    store.add_promo("EXPIRED", remaining_uses=0, discount_amount=Decimal("15.00"))
+    store.add_promo("DISCOUNT10", remaining_uses=5, discount_amount=to_cents("10.00"))
+    store.add_promo("EXPIRED", remaining_uses=0, discount_amount=to_cents("15.00"))
 
 
 def main() -> None:
@@ -50,9 +49,15 @@ def main() -> None:
 
     print("\n=== RESULT ===")
     print("success:", ok)
-    print("users:", store.users)
-    print("items:", store.items)
-    print("promos:", store.promos)
+    print("users:", {u.id: f"balance={format_cents(u.balance)}" for u in store.users.values()})
+    print("items:", {i.sku: f"price={format_cents(i.price)} on_hand={i.on_hand}" for i in store.items.values()})
+    print(
+        "promos:",
+        {
+            p.code: f"remaining_uses={p.remaining_uses} discount={format_cents(p.discount_amount)}"
+            for p in store.promos.values()
+        },
+    )
 
 
 if __name__ == "__main__":
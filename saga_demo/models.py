@@ -1,20 +1,34 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from decimal import Decimal
-from typing import Optional
+from decimal import ROUND_HALF_UP, Decimal
+
+
+def to_cents(amount: Decimal | str) -> int:
+    """Перевод денежной суммы ("100.00") в целые копейки — только на границе API.
+
+    Доли копейки округляются по правилу ROUND_HALF_UP: "0.005" -> 1, "-1.999" -> -200.
+    """
+    return int(Decimal(amount).quantize(Decimal("0.01"), ROUND_HALF_UP) * 100)
+
+
+def format_cents(cents: int) -> str:
+    """Обратное преобразование для логов: 9000 -> "90.00"."""
+    sign = "-" if cents < 0 else ""
+    cents = abs(cents)
+    return f"{sign}{cents // 100}.{cents % 100:02d}"
 
 
 @dataclass(slots=True)
 class User:
     id: int
-    balance: Decimal
+    balance: int  # в копейках
 
 
 @dataclass(slots=True)
 class InventoryItem:
     sku: str
-    price: Decimal
+    price: int  # в копейках
     on_hand: int
 
 
@@ -22,10 +36,10 @@ class InventoryItem:
 class PromoCode:
     code: str
     remaining_uses: int
-    discount_amount: Decimal
+    discount_amount: int  # в копейках
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class OrderRequest:
     """
     "Запрос на заказ" — просто данные для запуска Saga.
@@ -36,5 +50,5 @@ class OrderRequest:
     user_id: int
     sku: str
     qty: int
-    promo_code: Optional[str] = None
+    promo_code: str | None = None
 
@@ -1,12 +1,10 @@
 from __future__ import annotations
 
-from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from decimal import Decimal
-from typing import List, Optional
+from typing import Callable, List, Tuple, TypeVar
 
-from saga_demo.models import OrderRequest
-from saga_demo.services import BillingService, DiscountsService, InventoryService
+from saga_demo.models import InventoryItem, OrderRequest, PromoCode, format_cents
+from saga_demo.services import Undo, promo_discount
 from saga_demo.store import Store
 
 
@@ -14,152 +12,123 @@ class SagaError(Exception):
     pass
 
 
-class Step(ABC):
-    def __init__(self, store: Store, order_id: int):
-        self.store = store
-        self.order_id = order_id
-
-    @abstractmethod
-    def name(self) -> str: ...
-
-    @abstractmethod
-    def execute(self) -> None: ...
-
-    @abstractmethod
-    def compensate(self) -> None: ...
-
-    def run(self) -> None:
-        self.store.log(f"[order={self.order_id}] STEP {self.name()}")
-        self.execute()
-        self.store.log(f"[order={self.order_id}] STEP {self.name()} OK")
-
-    def run_compensation(self) -> None:
-        self.store.log(f"[order={self.order_id}] COMPENSATE {self.name()}")
-        self.compensate()
-        self.store.log(f"[order={self.order_id}] COMPENSATE {self.name()} OK")
-
-
-class ReservePromoUse(Step):
-    def __init__(self, store: Store, order_id: int, promo_code: str):
-        super().__init__(store, order_id)
-        self.promo_code = promo_code
-        self.service = DiscountsService(store)
-
-    def name(self) -> str:
-        return "ReservePromoUse"
-
-    def execute(self) -> None:
-        self.service.reserve_promo_use(self.order_id, self.promo_code)
-
-    def compensate(self) -> None:
-        self.service.release_promo_use(self.order_id, self.promo_code)
-
-
-class ReserveInventory(Step):
-    def __init__(self, store: Store, order_id: int, sku: str, qty: int):
-        super().__init__(store, order_id)
-        self.sku = sku
-        self.qty = qty
-        self.service = InventoryService(store)
-
-    def name(self) -> str:
-        return "ReserveInventory"
-
-    def execute(self) -> None:
-        self.service.reserve_inventory(self.order_id, self.sku, self.qty)
-
-    def compensate(self) -> None:
-        self.service.release_inventory(self.order_id, self.sku, self.qty)
-
+# Имена шагов Saga (используются в логах и для fail_at_step).
+RESERVE_PROMO_USE = "ReservePromoUse"
+RESERVE_INVENTORY = "ReserveInventory"
+CHARGE_USER_BALANCE = "ChargeUserBalance"
+FINALIZE_ORDER = "FinalizeOrder"
 
-class ChargeUserBalance(Step):
-    def __init__(self, store: Store, order_id: int, user_id: int, amount: Decimal):
-        super().__init__(store, order_id)
-        self.user_id = user_id
-        self.amount = amount
-        self.service = BillingService(store)
+T = TypeVar("T")
 
-    def name(self) -> str:
-        return "ChargeUserBalance"
+# Компенсация: (имя шага, откат, который вернул сервис при выполнении шага).
+Compensation = Tuple[str, Undo]
 
-    def execute(self) -> None:
-        self.service.charge_user_balance(self.order_id, self.user_id, self.amount)
 
-    def compensate(self) -> None:
-        self.service.refund_user_balance(self.order_id, self.user_id, self.amount)
-
-
-class FinalizeOrder(Step):
-    def name(self) -> str:
-        return "FinalizeOrder"
-
-    def execute(self) -> None:
-        # В этом упрощённом демо "финализация" — просто лог.
-        self.store.log(f"[order={self.order_id}] order finalized")
-
-    def compensate(self) -> None:
-        # Обычно тут либо нет компенсации, либо она зависит от бизнеса.
-        self.store.log(f"[order={self.order_id}] finalize has no compensation")
-
-
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class OrderAmounts:
-    base_amount: Decimal
-    discount_amount: Decimal
-    final_amount: Decimal
+    # Все суммы — в копейках.
+    base_amount: int
+    discount_amount: int
+    final_amount: int
 
 
 class SagaOrchestrator:
     def __init__(self, store: Store):
         self.store = store
 
-    def _calculate_amounts(self, req: OrderRequest) -> OrderAmounts:
-        item = self.store.items.get(req.sku)
-        if not item:
-            raise ValueError(f"Item {req.sku} not found")
-
-        base = (item.price * Decimal(req.qty)).quantize(Decimal("0.01"))
-        discount = DiscountsService(self.store).calculate_discount(req.promo_code, base).quantize(Decimal("0.01"))
-        final = (base - discount).quantize(Decimal("0.01"))
-        return OrderAmounts(base_amount=base, discount_amount=discount, final_amount=final)
+    @staticmethod
+    def _calculate_amounts(item: InventoryItem, qty: int, promo: PromoCode | None) -> OrderAmounts:
+        base = item.price * qty
+        discount = promo_discount(promo, base)
+        return OrderAmounts(base, discount, base - discount)
 
-    def execute(self, req: OrderRequest, fail_at_step: Optional[str] = None) -> bool:
-        self.store.log(f"[order={req.order_id}] SAGA START user={req.user_id} sku={req.sku} qty={req.qty} promo={req.promo_code}")
+    def execute(self, req: OrderRequest, fail_at_step: str | None = None) -> bool:
+        try:
+            return self._execute(req, fail_at_step)
+        finally:
+            self.store.flush_logs()
 
+    def _execute(self, req: OrderRequest, fail_at_step: str | None) -> bool:
+        # Валидация — до первого лога: некорректный запрос не оставляет следов в логах.
         if req.qty <= 0:
             raise ValueError("qty must be > 0")
-        if req.user_id not in self.store.users:
+        # Объекты ищем в хранилище один раз и дальше передаём в сервисы напрямую.
+        store = self.store
+        user = store.users.get(req.user_id)
+        if user is None:
             raise ValueError(f"User {req.user_id} not found")
-
-        amounts = self._calculate_amounts(req)
-        self.store.log(
-            f"[order={req.order_id}] amounts: base={amounts.base_amount} discount={amounts.discount_amount} final={amounts.final_amount}"
+        item = store.items.get(req.sku)
+        if item is None:
+            raise ValueError(f"Item {req.sku} not found")
+        code = req.promo_code
+        promo = store.promos.get(code) if code else None
+        amounts = self._calculate_amounts(item, req.qty, promo)
+
+        order_id = req.order_id
+        store.log(
+            "[order=%s] SAGA START user=%s sku=%s qty=%s promo=%s",
+            order_id, req.user_id, req.sku, req.qty, code,
+        )
+        store.log(
+            "[order=%s] amounts: base=%s discount=%s final=%s",
+            order_id,
+            format_cents(amounts.base_amount),
+            format_cents(amounts.discount_amount),
+            format_cents(amounts.final_amount),
         )
 
-        steps: List[Step] = []
-        if req.promo_code:
-            steps.append(ReservePromoUse(self.store, req.order_id, req.promo_code))
-        steps.append(ReserveInventory(self.store, req.order_id, req.sku, req.qty))
-        steps.append(ChargeUserBalance(self.store, req.order_id, req.user_id, amounts.final_amount))
-        steps.append(FinalizeOrder(self.store, req.order_id))
-
-        completed: List[Step] = []
+        comps: List[Compensation] = []
         try:
-            for step in steps:
-                if fail_at_step == step.name():
-                    raise SagaError(f"Artificial failure at step {step.name()}")
-                step.run()
-                completed.append(step)
-
-            self.store.log(f"[order={req.order_id}] SAGA OK")
+            # Набор шагов фиксирован, поэтому выполняем их напрямую, без объектов-шагов.
+            if code:
+                if promo is None:
+                    raise ValueError(f"Promo {code} not found")
+                undo = self._run_step(order_id, RESERVE_PROMO_USE, fail_at_step,
+                                      store.discounts.reserve_promo_use, order_id, promo)
+                comps.append((RESERVE_PROMO_USE, undo))
+
+            undo = self._run_step(order_id, RESERVE_INVENTORY, fail_at_step,
+                                  store.inventory.reserve_inventory, order_id, item, req.qty)
+            comps.append((RESERVE_INVENTORY, undo))
+
+            undo = self._run_step(order_id, CHARGE_USER_BALANCE, fail_at_step,
+                                  store.billing.charge_user_balance, order_id, user, amounts.final_amount)
+            comps.append((CHARGE_USER_BALANCE, undo))
+
+            # Финализация — последний шаг, после неё откатывать нечего.
+            self._run_step(order_id, FINALIZE_ORDER, fail_at_step, self._finalize, order_id)
+
+            store.log("[order=%s] SAGA OK", order_id)
             return True
         except Exception as e:
-            self.store.log(f"[order={req.order_id}] SAGA FAILED: {e}")
-            for step in reversed(completed):
-                try:
-                    step.run_compensation()
-                except Exception as comp_exc:
-                    self.store.log(f"[order={req.order_id}] COMPENSATION FAILED at {step.name()}: {comp_exc}")
-            self.store.log(f"[order={req.order_id}] SAGA END (failed)")
+            store.log("[order=%s] SAGA FAILED: %s", order_id, e)
+            # Упали на первом шаге — откатывать нечего.
+            if comps:
+                self._compensate(order_id, comps)
+            store.log("[order=%s] SAGA END (failed)", order_id)
             return False
 
+    def _compensate(self, order_id: int, comps: List[Compensation]) -> None:
+        log = self.store.log
+        for name, undo in reversed(comps):
+            try:
+                log("[order=%s] COMPENSATE %s", order_id, name)
+                undo()
+                log("[order=%s] COMPENSATE %s OK", order_id, name)
+            except Exception as comp_exc:
+                log("[order=%s] COMPENSATION FAILED at %s: %s", order_id, name, comp_exc)
+
+    def _run_step(
+        self, order_id: int, name: str, fail_at_step: str | None, fn: Callable[..., T], *args: object
+    ) -> T:
+        if fail_at_step == name:
+            raise SagaError(f"Artificial failure at step {name}")
+        log = self.store.log
+        log("[order=%s] STEP %s", order_id, name)
+        result = fn(*args)
+        log("[order=%s] STEP %s OK", order_id, name)
+        return result
+
+    def _finalize(self, order_id: int) -> None:
+        # В этом упрощённом демо "финализация" — просто лог.
+        self.store.log("[order=%s] order finalized", order_id)
@@ -1,77 +1,83 @@
 from __future__ import annotations
 
-from decimal import Decimal
+from functools import partial
+from typing import TYPE_CHECKING, Callable
 
-from saga_demo.store import Store
+from saga_demo.models import InventoryItem, PromoCode, User, format_cents
+
+if TYPE_CHECKING:
+    from saga_demo.store import Store
+
+# Откат уже выполненного изменения. Сервисы работают с уже найденными объектами
+# (User/InventoryItem/PromoCode), поэтому откат не ищет их в хранилище повторно.
+Undo = Callable[[], None]
+
+
+def promo_discount(promo: PromoCode | None, base_amount: int) -> int:
+    """Скидка по промокоду (в копейках): не больше суммы заказа, 0 если промокод не действует."""
+    if promo is None or promo.remaining_uses <= 0:
+        return 0
+    # Вызывается оркестратором на каждый заказ: для двух чисел сравниваем явно, без min().
+    d = promo.discount_amount
+    return d if d < base_amount else base_amount
 
 
 class DiscountsService:
     def __init__(self, store: Store):
         self.store = store
 
-    def calculate_discount(self, promo_code: str | None, base_amount: Decimal) -> Decimal:
+    def calculate_discount(self, promo_code: str | None, base_amount: int) -> int:
         if not promo_code:
-            return Decimal("0.00")
-        promo = self.store.promos.get(promo_code)
-        if not promo or promo.remaining_uses <= 0:
-            return Decimal("0.00")
-        return min(promo.discount_amount, base_amount)
-
-    def reserve_promo_use(self, order_id: int, promo_code: str) -> None:
-        promo = self.store.promos.get(promo_code)
-        if not promo:
-            raise ValueError(f"Promo {promo_code} not found")
+            return 0
+        return promo_discount(self.store.promos.get(promo_code), base_amount)
+
+    def reserve_promo_use(self, order_id: int, promo: PromoCode) -> Undo:
         if promo.remaining_uses <= 0:
-            raise ValueError(f"Promo {promo_code} has no remaining uses")
+            raise ValueError(f"Promo {promo.code} has no remaining uses")
         promo.remaining_uses -= 1
-        self.store.log(f"[order={order_id}] promo reserved: {promo_code} (remaining={promo.remaining_uses})")
+        self.store.log("[order=%s] promo reserved: %s (remaining=%s)", order_id, promo.code, promo.remaining_uses)
+        return partial(self.release_promo_use, order_id, promo)
 
-    def release_promo_use(self, order_id: int, promo_code: str) -> None:
-        promo = self.store.promos.get(promo_code)
-        if not promo:
-            return
+    def release_promo_use(self, order_id: int, promo: PromoCode) -> None:
         promo.remaining_uses += 1
-        self.store.log(f"[order={order_id}] promo released: {promo_code} (remaining={promo.remaining_uses})")
+        self.store.log("[order=%s] promo released: %s (remaining=%s)", order_id, promo.code, promo.remaining_uses)
 
 
 class InventoryService:
     def __init__(self, store: Store):
         self.store = store
 
-    def reserve_inventory(self, order_id: int, sku: str, qty: int) -> None:
-        item = self.store.items.get(sku)
-        if not item:
-            raise ValueError(f"Item {sku} not found")
+    def reserve_inventory(self, order_id: int, item: InventoryItem, qty: int) -> Undo:
         if item.on_hand < qty:
-            raise ValueError(f"Insufficient inventory for {sku}: have={item.on_hand}, need={qty}")
+            raise ValueError(f"Insufficient inventory for {item.sku}: have={item.on_hand}, need={qty}")
         item.on_hand -= qty
-        self.store.log(f"[order={order_id}] inventory reserved: {sku} qty={qty} (on_hand={item.on_hand})")
+        self.store.log("[order=%s] inventory reserved: %s qty=%s (on_hand=%s)", order_id, item.sku, qty, item.on_hand)
+        return partial(self.release_inventory, order_id, item, qty)
 
-    def release_inventory(self, order_id: int, sku: str, qty: int) -> None:
-        item = self.store.items.get(sku)
-        if not item:
-            return
+    def release_inventory(self, order_id: int, item: InventoryItem, qty: int) -> None:
         item.on_hand += qty
-        self.store.log(f"[order={order_id}] inventory released: {sku} qty={qty} (on_hand={item.on_hand})")
+        self.store.log("[order=%s] inventory released: %s qty=%s (on_hand=%s)", order_id, item.sku, qty, item.on_hand)
 
 
 class BillingService:
     def __init__(self, store: Store):
         self.store = store
 
-    def charge_user_balance(self, order_id: int, user_id: int, amount: Decimal) -> None:
-        user = self.store.users.get(user_id)
-        if not user:
-            raise ValueError(f"User {user_id} not found")
+    def charge_user_balance(self, order_id: int, user: User, amount: int) -> Undo:
         if user.balance < amount:
-            raise ValueError(f"Insufficient balance for user {user_id}: have={user.balance}, need={amount}")
+            raise ValueError(
+                f"Insufficient balance for user {user.id}: have={format_cents(user.balance)}, need={format_cents(amount)}"
+            )
         user.balance -= amount
-        self.store.log(f"[order={order_id}] charged user={user_id} amount={amount} (balance={user.balance})")
+        self.store.log(
+            "[order=%s] charged user=%s amount=%s (balance=%s)",
+            order_id, user.id, format_cents(amount), format_cents(user.balance),
+        )
+        return partial(self.refund_user_balance, order_id, user, amount)
 
-    def refund_user_balance(self, order_id: int, user_id: int, amount: Decimal) -> None:
-        user = self.store.users.get(user_id)
-        if not user:
-            return
+    def refund_user_balance(self, order_id: int, user: User, amount: int) -> None:
         user.balance += amount
-        self.store.log(f"[order={order_id}] refunded user={user_id} amount={amount} (balance={user.balance})")
-
+        self.store.log(
+            "[order=%s] refunded user=%s amount=%s (balance=%s)",
+            order_id, user.id, format_cents(amount), format_cents(user.balance),
+        )
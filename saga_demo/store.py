@@ -1,10 +1,10 @@
 from __future__ import annotations
 
 import logging
-from decimal import Decimal
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 from saga_demo.models import InventoryItem, PromoCode, User
+from saga_demo.services import BillingService, DiscountsService, InventoryService
 
 logger = logging.getLogger(__name__)
 
@@ -20,27 +20,98 @@ class Store:
 
     Только:
     - текущее состояние ресурсов (баланс/склад/промокоды)
-    - список логов (для демонстрации и тестов)
+    - логи (для демонстрации и тестов)
+
+    Логи хранятся одним буфером байт и уходят в `logging` пачкой через `flush_logs()`.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, collect_logs: bool = True) -> None:
         self.users: Dict[int, User] = {}
         self.items: Dict[str, InventoryItem] = {}
         self.promos: Dict[str, PromoCode] = {}
 
-        self.logs: List[str] = []
+        self._logbuf = bytearray()
+        self._flushed = 0  # сколько байт из _logbuf уже отдано в logging
+        # Индекс для order_logs(): order_id -> байтовые отрезки (start, end) его строк.
+        # Строится лениво, только по строкам, дописанным после прошлого вызова.
+        self._logs_by_order: Dict[int, List[Tuple[int, int]]] = {}
+        self._indexed = 0  # до какого байта _logbuf индекс уже построен
+        self._log_enabled = logger.isEnabledFor(logging.INFO)
+        self._collect = collect_logs
+
+        # Сервисы не имеют своего состояния — создаём их один раз на хранилище.
+        self.discounts = DiscountsService(self)
+        self.inventory = InventoryService(self)
+        self.billing = BillingService(self)
+
+    def log(self, message: str, *args: object) -> None:
+        # Формат "%s" применяется лениво: только если строку копят (collect_logs)
+        # или уровень INFO был включён на момент создания Store.
+        if not (self._collect or self._log_enabled):
+            return
+        if args:
+            message = message % args
+        # Одна запись — одна строка буфера, поэтому "\n" внутри сообщения экранируем.
+        if "\n" in message:
+            message = message.replace("\n", "\\n")
+        self._logbuf += (message + "\n").encode()
+
+    @property
+    def logs(self) -> List[str]:
+        # Только для чтения: каждый раз собирается новый список из буфера,
+        # поэтому append/clear на результате ничего не меняют в Store.
+        if not self._collect:
+            return []
+        return self._logbuf.decode().split("\n")[:-1]
+
+    def order_logs(self, order_id: int) -> List[str]:
+        if not self._collect:
+            return []
+        self._index_new_lines()
+        spans = self._logs_by_order.get(order_id)
+        if not spans:
+            return []
+        buf = self._logbuf
+        return [buf[start:end].decode() for start, end in spans]
+
+    def _index_new_lines(self) -> None:
+        buf = self._logbuf
+        index = self._logs_by_order
+        start = self._indexed
+        size = len(buf)
+        while start < size:
+            end = buf.find(b"\n", start)
+            close = buf.find(b"]", start + 7, end) if buf.startswith(b"[order=", start, end) else -1
+            if close != -1:
+                try:
+                    order_id = int(buf[start + 7:close])
+                except ValueError:
+                    pass
+                else:
+                    index.setdefault(order_id, []).append((start, end))
+            start = end + 1
+        self._indexed = start
 
-    def log(self, message: str) -> None:
-        self.logs.append(message)
-        logger.info(message)
+    def flush_logs(self) -> None:
+        # Уровень проверяется заново: logging могли настроить уже после создания Store.
+        buf = self._logbuf
+        if self._flushed == len(buf):
+            return
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(buf[self._flushed:-1].decode())
+        if self._collect:
+            self._flushed = len(buf)
+        else:
+            buf.clear()
+            self._flushed = 0
 
     # Seed helpers (удобно для тестов/демо)
-    def add_user(self, user_id: int, balance: Decimal) -> None:
+    def add_user(self, user_id: int, balance: int) -> None:
         self.users[user_id] = User(id=user_id, balance=balance)
 
-    def add_item(self, sku: str, price: Decimal, on_hand: int) -> None:
+    def add_item(self, sku: str, price: int, on_hand: int) -> None:
         self.items[sku] = InventoryItem(sku=sku, price=price, on_hand=on_hand)
 
-    def add_promo(self, code: str, remaining_uses: int, discount_amount: Decimal) -> None:
+    def add_promo(self, code: str, remaining_uses: int, discount_amount: int) -> None:
         self.promos[code] = PromoCode(code=code, remaining_uses=remaining_uses, discount_amount=discount_amount)
 
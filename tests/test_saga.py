@@ -1,11 +1,11 @@
 """Tests for Order Saga orchestration."""
 import logging
-from decimal import Decimal
 
 import pytest
 
-from saga_demo.models import OrderRequest
+from saga_demo.models import OrderRequest, format_cents, to_cents
 from saga_demo.saga import SagaOrchestrator
+from saga_demo.store import Store
 
 # Configure logging for tests
 logging.basicConfig(
@@ -15,7 +15,8 @@ logging.basicConfig(
 
 
 def _order_logs(store, order_id: int) -> list[str]:
-    return [line for line in store.logs if f"[order={order_id}]" in line]
+    key = f"[order={order_id}]"
+    return [l for l in store.logs if key in l]
 
 
 def test_successful_order_without_promo(store):
@@ -35,7 +36,7 @@ def test_successful_order_without_promo(store):
     
     # Check balance
     user = store.users[1]
-    assert user.balance == Decimal("800.00")  # 1000 - 200
+    assert user.balance == to_cents("800.00")  # 1000 - 200
     
     logs = _order_logs(store, 1)
     assert any("STEP ReservePromoUse" in l for l in logs) is False
@@ -71,7 +72,7 @@ def test_successful_order_with_promo(store):
     
     # Check balance (discount applied)
     user = store.users[1]
-    assert user.balance == Decimal("910.00")  # 1000 - 90
+    assert user.balance == to_cents("910.00")  # 1000 - 90
     
     logs = _order_logs(store, 2)
     assert any("STEP ReservePromoUse OK" in l for l in logs)
@@ -96,7 +97,7 @@ def test_fail_on_insufficient_promo_uses(store):
     
     # Check that balance was NOT charged
     user = store.users[1]
-    assert user.balance == Decimal("1000.00")  # Unchanged
+    assert user.balance == to_cents("1000.00")  # Unchanged
     
     logs = _order_logs(store, 3)
     assert any("STEP ReservePromoUse OK" in l for l in logs) is False
@@ -130,7 +131,7 @@ def test_fail_on_insufficient_inventory(store):
     
     # Check balance unchanged
     user = store.users[1]
-    assert user.balance == Decimal("1000.00")  # Unchanged
+    assert user.balance == to_cents("1000.00")  # Unchanged
     
     logs = _order_logs(store, 4)
     assert any("COMPENSATE ReservePromoUse OK" in l for l in logs)
@@ -165,7 +166,7 @@ def test_fail_on_insufficient_balance(store):
     
     # Check balance unchanged
     user = store.users[2]
-    assert user.balance == Decimal("50.00")  # Unchanged
+    assert user.balance == to_cents("50.00")  # Unchanged
     
     logs = _order_logs(store, 5)
     assert any("COMPENSATE ReserveInventory OK" in l for l in logs)
@@ -232,3 +233,135 @@ def test_order_without_promo_succeeds(store):
     assert any("STEP FinalizeOrder OK" in l for l in logs)
     
     logging.info("✓ Order without promo correctly skipped promo step")
+
+
+def test_invalid_request_fails_before_saga_start(store):
+    """Test that request validation happens before any saga logs are written."""
+    logging.info("\n=== TEST: Invalid request fails before SAGA START ===")
+
+    saga = SagaOrchestrator(store)
+    with pytest.raises(ValueError):
+        saga.execute(OrderRequest(order_id=8, user_id=1, sku="ITEM001", qty=0))
+    with pytest.raises(ValueError):
+        saga.execute(OrderRequest(order_id=8, user_id=999, sku="ITEM001", qty=1))
+
+    # Nothing was reserved and nothing was logged
+    assert store.items["ITEM001"].on_hand == 10
+    assert _order_logs(store, 8) == []
+
+    logging.info("✓ Invalid request rejected without saga logs")
+
+
+def test_order_logs_index(store):
+    """Test that per-order log index matches a plain scan over all logs."""
+    logging.info("\n=== TEST: Per-order log index ===")
+
+    saga = SagaOrchestrator(store)
+    saga.execute(OrderRequest(order_id=9, user_id=1, sku="ITEM001", qty=1, promo_code="DISCOUNT10"))
+    logs_9 = store.order_logs(9)
+    # Index is extended with lines written after the previous order_logs() call
+    saga.execute(OrderRequest(order_id=10, user_id=2, sku="ITEM002", qty=2, promo_code="DISCOUNT10"))
+    store.log("[order=%s] late line", 9)
+    assert store.order_logs(9) == logs_9 + ["[order=9] late line"]
+    store.log("unrelated line")
+
+    for order_id in (9, 10):
+        key = f"[order={order_id}]"
+        assert store.order_logs(order_id) == [l for l in store.logs if l.startswith(key)]
+    assert store.order_logs(11) == []
+
+    logging.info("✓ Per-order log index is consistent")
+
+
+def test_money_conversion_rounds_to_cents():
+    """Test that sub-cent amounts are rounded half-up at the API boundary."""
+    assert to_cents("100.00") == 10000
+    assert to_cents("0.005") == 1
+    assert to_cents("0.004") == 0
+    assert to_cents("-1.999") == -200
+    assert format_cents(to_cents("90.5")) == "90.50"
+    assert format_cents(-5) == "-0.05"
+
+
+class _Unformattable:
+    def __str__(self) -> str:
+        raise AssertionError("log message was formatted")
+
+
+def test_disabled_logs_are_not_formatted(caplog):
+    """Test that Store skips formatting when logs are neither collected nor emitted."""
+    caplog.set_level(logging.WARNING, logger="saga_demo.store")
+    store = Store(collect_logs=False)
+
+    store.log("[order=%s] value=%s", 1, _Unformattable())
+    store.flush_logs()
+
+    assert store.logs == []
+    assert store.order_logs(1) == []
+    assert not [r for r in caplog.records if r.name == "saga_demo.store"]
+
+
+def test_uncollected_logs_are_flushed_once(caplog):
+    """Test that with collect_logs=False logs still reach logging and the buffer is dropped."""
+    caplog.set_level(logging.INFO, logger="saga_demo.store")
+    store = Store(collect_logs=False)
+    store.add_user(1, to_cents("100.00"))
+    store.add_item("ITEM001", price=to_cents("10.00"), on_hand=1)
+
+    assert SagaOrchestrator(store).execute(OrderRequest(order_id=1, user_id=1, sku="ITEM001", qty=1)) is True
+    store.flush_logs()
+
+    records = [r for r in caplog.records if r.name == "saga_demo.store"]
+    assert len(records) == 1
+    assert "[order=1] SAGA OK" in records[0].getMessage()
+    assert store.logs == []
+
+
+def test_logging_configured_after_store_creation(caplog):
+    """Test that a collecting Store emits logs even if INFO was enabled after it was created."""
+    caplog.set_level(logging.WARNING, logger="saga_demo.store")
+    store = Store()
+    caplog.set_level(logging.INFO, logger="saga_demo.store")
+
+    store.log("[order=%s] hello", 1)
+    store.flush_logs()
+
+    assert [r.getMessage() for r in caplog.records if r.name == "saga_demo.store"] == ["[order=1] hello"]
+
+
+def test_discount_is_capped_by_order_amount(store):
+    """Test the shared discount rule used by the orchestrator and DiscountsService."""
+    discounts = store.discounts
+    assert discounts.calculate_discount("ONETIME", to_cents("5.00")) == to_cents("5.00")
+    assert discounts.calculate_discount("ONETIME", to_cents("100.00")) == to_cents("20.00")
+    assert discounts.calculate_discount("EXPIRED", to_cents("100.00")) == 0
+    assert discounts.calculate_discount("UNKNOWN", to_cents("100.00")) == 0
+    assert discounts.calculate_discount(None, to_cents("100.00")) == 0
+
+
+def test_one_log_call_is_one_log_line(store):
+    """Test that a message with an embedded newline stays a single entry in store.logs."""
+    store.log("first")
+    assert store.logs == ["first"]
+    store.log("[order=%s] multi\nline", 1)
+    store.log("last")
+
+    assert store.logs == ["first", "[order=1] multi\\nline", "last"]
+
+
+def test_order_logs_with_newline_in_message(store):
+    """Test that a newline inside a logged value does not shift later orders' log lines."""
+    store.add_item("A\nB", price=to_cents("1.00"), on_hand=5)
+
+    saga = SagaOrchestrator(store)
+    assert saga.execute(OrderRequest(order_id=1, user_id=1, sku="A\nB", qty=1)) is True
+    assert saga.execute(OrderRequest(order_id=2, user_id=1, sku="ITEM001", qty=1)) is True
+
+    logs_1 = store.order_logs(1)
+    logs_2 = store.order_logs(2)
+    assert all(l.startswith("[order=1]") for l in logs_1)
+    assert all(l.startswith("[order=2]") for l in logs_2)
+    assert logs_1[0] == "[order=1] SAGA START user=1 sku=A\\nB qty=1 promo=None"
+    assert logs_2[0] == "[order=2] SAGA START user=1 sku=ITEM001 qty=1 promo=None"
+    assert logs_2[-1] == "[order=2] SAGA OK"
+    assert logs_1 + logs_2 == store.logs